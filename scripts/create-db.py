@@ -5,23 +5,266 @@ Build Dawncaster cards database from Blightbane API.
 Usage: python run create-db/run.py <output_database.db>
 """
 
+import os
 import sqlite3
 import sys
+import tempfile
 import time
 import re
-from urllib.request import urlopen
-from urllib.parse import urlencode
+import threading
+import http.client
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from itertools import chain, product
+from urllib.parse import urljoin, urlsplit
 from urllib.error import HTTPError, URLError
 import json
+from pathlib import Path
+
+# Global request rate across all worker threads (respects the API). Starts at
+# the known-good rate and only climbs towards the maximum while the server is happy.
+REQUESTS_PER_SECOND = 4
+MAX_REQUESTS_PER_SECOND = 10
+# Worker threads for HTTP fetches; database writes stay on the main thread
+MAX_WORKERS = 8
+# Items between progress reports while fetching details, and while running
+# the (far fewer) search queries
+PROGRESS_INTERVAL = 100
+QUERY_PROGRESS_INTERVAL = 10
+# Rows per insert transaction; committing per row fsyncs the journal every time
+BATCH_SIZE = 1000
+# Rows per multi-row INSERT, capped so no statement exceeds SQLite's
+# historical 999 bound-variable limit
+ROWS_PER_STATEMENT = 100
+MAX_VARIABLES = 999
+
+# Filters and card/talent responses keyed by bundle version, reused across runs
+CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'dawncaster-cards'
+
+# Bundle version in the homepage: index.bundle.js?v=X.X.X
+_BUNDLE_VERSION_RE = re.compile(r'index\.bundle\.js\?v=([0-9.]+)')
+
+# Filter arrays in the JavaScript bundle, using the patterns from the skill
+_FILTER_PATTERNS = {
+    # Categories: ["Action","Item",...]
+    'categories': re.compile(r'"Action","Item"[^]]*'),
+    # Types: ["Melee","Magic",...]
+    'types': re.compile(r'"Melee","Magic"[^]]*'),
+    # Rarities: ["Common","Uncommon",...]
+    'rarities': re.compile(r'"Common","Uncommon"[^]]*'),
+    # Banners/Colors: ["Green","Blue","Red","Purple",...]
+    'colors': re.compile(r'"Green","Blue","Red","Purple"[^]]*'),
+    # Expansions: ["Core","Metaprogress",...]
+    'expansions': re.compile(r'"Core","Metaprogress"[^]]*'),
+}
+
+# All filter patterns as one alternation, so the bundle is scanned once. Each
+# alternative is a zero-width lookahead, so one array's match never consumes the
+# start of another and the first occurrence of each is found, as with re.search
+_ALL_FILTERS_RE = re.compile('|'.join(
+    f'(?=(?P<{filter_name}>{pattern.pattern}))' for filter_name, pattern in _FILTER_PATTERNS.items()
+))
+
+# Fields talent_row/card_rows cannot default; detail responses missing them are never cached
+TALENT_REQUIRED_FIELDS = ('id', 'name', 'tier', 'expansion')
+CARD_REQUIRED_FIELDS = ('id', 'name', 'category', 'type', 'rarity', 'expansion', 'color')
+
+# Fields a search result needs before it can be stored without a detail fetch
+TALENT_FIELDS = TALENT_REQUIRED_FIELDS + ('description', 'prereq')
+CARD_FIELDS = CARD_REQUIRED_FIELDS + ('description', 'cost')
+
+# Each insert is (statement prefix, one row's placeholders); insert_rows repeats
+# the placeholders to build single- and multi-row statements
+TALENT_INSERTS = (
+    (
+        "INSERT INTO talents (id, name, tier, expansion, description_html) VALUES ",
+        "(?, ?, ?, ?, ?)",
+    ),
+)
+
+CARD_INSERTS = (
+    (
+        "INSERT INTO cards (id, name, category, type, rarity, expansion, color, description_html) VALUES ",
+        "(?, ?, ?, ?, ?, ?, ?, ?)",
+    ),
+    (
+        "INSERT INTO costs (card_id, dex, int, str, holy, neutral, dexint, dexstr, intstr, blood) VALUES ",
+        "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    ),
+)
+
+
+class RateLimiter:
+    """Space requests evenly across threads, adapting the global rate to the server.
+
+    The rate halves whenever the server throttles or errors, and recovers by
+    one request/s after every run of consecutive successes, up to max_rate.
+    """
+
+    def __init__(self, rate, max_rate, min_rate=0.5, recovery_successes=20):
+        self.rate = rate
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.recovery_successes = recovery_successes
+        self.successes = 0
+        # Bumped on every cut; requests remember the epoch their slot was assigned in
+        self.epoch = 0
+        self.lock = threading.Lock()
+        self.next_slot = time.monotonic()
+
+    def wait(self):
+        """Block until the calling thread may issue its next request, returning the rate epoch of its slot."""
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + 1.0 / self.rate
+            epoch = self.epoch
+        if slot > now:
+            time.sleep(slot - now)
+        return epoch
+
+    def record_success(self):
+        """Note a successful response, slowly raising the rate."""
+        with self.lock:
+            self.successes += 1
+            if self.successes >= self.recovery_successes and self.rate < self.max_rate:
+                self.rate = min(self.rate + 1, self.max_rate)
+                self.successes = 0
+
+    def record_backoff(self, epoch):
+        """Note a throttled or failed response to a request scheduled in epoch, halving the rate."""
+        with self.lock:
+            self.successes = 0
+            # Requests scheduled before the last cut (in flight or still sleeping in
+            # wait()) were spaced at the old rate, so their failures are the same
+            # push-back; cut each rate level at most once
+            if epoch != self.epoch:
+                return
+            self.epoch += 1
+            self.rate = max(self.rate / 2, self.min_rate)
+            log(f"  Server pushing back, slowing to {self.rate:g} requests/s")
+
+
+rate_limiter = RateLimiter(REQUESTS_PER_SECOND, MAX_REQUESTS_PER_SECOND)
+
+
+# Same User-Agent urlopen sent, so the API sees the same request headers as before
+USER_AGENT = f"Python-urllib/{sys.version_info[0]}.{sys.version_info[1]}"
+
+# Persistent keep-alive connections, one per host per thread (http.client is not thread-safe)
+_connections = threading.local()
+
+
+_CONNECTION_CLASSES = {
+    'https': http.client.HTTPSConnection,
+    'http': http.client.HTTPConnection,
+}
+
+
+def _get_connection(scheme, host):
+    """Return this thread's open connection to scheme://host, creating it on first use."""
+    if scheme not in _CONNECTION_CLASSES:
+        raise ValueError(f"Unsupported URL scheme: {scheme!r}")
+    pool = getattr(_connections, 'pool', None)
+    if pool is None:
+        pool = _connections.pool = {}
+    if (scheme, host) not in pool:
+        pool[scheme, host] = _CONNECTION_CLASSES[scheme](host, timeout=30)
+    return pool[scheme, host]
+
+
+def close_connections(pools):
+    """Close every connection in the given per-thread connection pools."""
+    for pool in pools:
+        for conn in pool.values():
+            conn.close()
+        pool.clear()
+
+
+def http_get(url, max_redirects=5):
+    """GET url over a reused keep-alive connection and return the response body as bytes."""
+    parts = urlsplit(url)
+    path = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+    conn = _get_connection(parts.scheme, parts.netloc)
+
+    # A reused connection may have been closed by the server while idle; reconnect once
+    for attempt in range(2):
+        try:
+            conn.request('GET', path, headers={'User-Agent': USER_AGENT})
+            response = conn.getresponse()
+            body = response.read()
+            break
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            conn.close()
+            if attempt == 1:
+                raise
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            raise
+
+    if response.status in (301, 302, 303, 307, 308) and max_redirects > 0:
+        return http_get(urljoin(url, response.getheader('Location')), max_redirects - 1)
+    if response.status != 200:
+        raise HTTPError(url, response.status, response.reason, response.headers, None)
+    return body
+
+
+# Guards stdout so worker messages and the in-place progress line don't interleave
+_output_lock = threading.Lock()
+_progress_line_active = False
+
+
+def log(message):
+    """Print a message that may arrive mid-loop, first clearing any in-place progress line."""
+    global _progress_line_active
+    with _output_lock:
+        if _progress_line_active:
+            print('\r\033[K', end='')
+            _progress_line_active = False
+        print(message, flush=True)
+
+
+def print_progress(done, total, label, interval=PROGRESS_INTERVAL):
+    """Report progress every interval items, rewriting one line when stdout is a terminal."""
+    global _progress_line_active
+    if done % interval and done != total:
+        return
+    with _output_lock:
+        if sys.stdout.isatty():
+            finished = done == total
+            print(f"\r\033[K  Progress: {done}/{total} {label}", end='\n' if finished else '', flush=True)
+            _progress_line_active = not finished
+        else:
+            print(f"  Progress: {done}/{total} {label}")
+
+
+def fetch_concurrently(fetch, items):
+    """Run fetch(item) on a thread pool, yielding (item, result) as each completes."""
+    pools = []
+
+    def init_worker():
+        # Track each worker's connections so they can be closed with the pool
+        _connections.pool = {}
+        pools.append(_connections.pool)
+
+    executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, initializer=init_worker)
+    try:
+        futures = {executor.submit(fetch, item): item for item in items}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        # If the consumer stops early (Ctrl-C, an insert error), drop the queued
+        # requests instead of sending them all; only in-flight ones finish
+        executor.shutdown(wait=True, cancel_futures=True)
+        close_connections(pools)
+
 
 def get_bundle_version():
     """Get the current bundle version from Blightbane homepage."""
     print("Fetching bundle version from Blightbane...")
-    with urlopen('https://blightbane.io') as response:
-        html = response.read().decode('utf-8')
+    html = http_get('https://blightbane.io').decode('utf-8')
 
-    # Extract bundle version: index.bundle.js?v=X.X.X
-    match = re.search(r'index\.bundle\.js\?v=([0-9.]+)', html)
+    match = _BUNDLE_VERSION_RE.search(html)
     if not match:
         raise Exception("Could not find bundle version in Blightbane homepage")
 
@@ -30,106 +273,143 @@ def get_bundle_version():
     return version
 
 
-def extract_filter_array(bundle_js, pattern, filter_name):
-    """Extract a filter array from the JavaScript bundle."""
-    match = re.search(pattern, bundle_js)
-    if not match:
-        raise Exception(f"Could not find {filter_name} array in bundle")
+def parse_string_array(array_str):
+    """Parse the contents of a JS array of string literals, e.g. '"Action","Item"'."""
+    # Minified plain names can simply be split; escapes or other separators
+    # (which leave a stray quote behind) go through the JSON parser
+    if '\\' not in array_str and len(array_str) >= 2 and array_str[0] == array_str[-1] == '"':
+        values = array_str[1:-1].split('","')
+        if not any('"' in value for value in values):
+            return values
+    return json.loads('[' + array_str + ']')
+
+
+def extract_filter_arrays(bundle_js):
+    """Extract all filter arrays from the JavaScript bundle in a single scan."""
+    found = {}
+    for match in _ALL_FILTERS_RE.finditer(bundle_js):
+        found.setdefault(match.lastgroup, match.group(match.lastgroup))
+        if len(found) == len(_FILTER_PATTERNS):
+            break
+
+    filters = {}
+    for filter_name in _FILTER_PATTERNS:
+        if filter_name not in found:
+            raise Exception(f"Could not find {filter_name} array in bundle")
+        filters[filter_name] = parse_string_array(found[filter_name])
+    return filters
+
 
-    # The match is a JSON-like array string, parse it
-    array_str = match.group(0)
-    # Parse as JSON
-    values = json.loads('[' + array_str + ']')
-    return values
+def _is_br_tag(inner):
+    """Whether the text between '<' and '>' is a line break (br, br/ or br /)."""
+    if inner[:2].lower() != 'br':
+        return False
+    rest = inner[2:]
+    if rest.endswith('/'):
+        rest = rest[:-1]
+    return not rest or rest.isspace()
 
 
 def sanitize_html(html):
-    """Remove all HTML tags except <br> and <br/>."""
+    """Remove all HTML tags except <br> and <br/>.
+
+    Scans left to right with str.find, so descriptions full of stray '<'
+    characters stay linear time instead of making a regex backtrack.
+    """
     if not html:
         return ''
-    # Remove all tags except br
-    cleaned = re.sub(r'<(?!br\s*\/?>).*?>', '', html, flags=re.IGNORECASE | re.DOTALL)
-    return cleaned
+
+    parts = []
+    position = 0
+    while True:
+        start = html.find('<', position)
+        if start < 0:
+            break
+        end = html.find('>', start + 1)
+        if end < 0:
+            # No closing '>' left, so the rest is plain text
+            break
+        parts.append(html[position:start])
+        if _is_br_tag(html[start + 1:end]):
+            parts.append(html[start:end + 1])
+        position = end + 1
+
+    parts.append(html[position:])
+    return ''.join(parts)
 
 
 def fetch_with_retry(url, max_retries=3, base_delay=1.0):
-    """Fetch URL with exponential backoff retry for transient errors."""
+    """Fetch URL with exponential backoff retry for transient errors, returning the raw body bytes."""
     for attempt in range(max_retries):
+        epoch = rate_limiter.wait()
         try:
-            with urlopen(url) as response:
-                return response.read().decode('utf-8')
+            data = http_get(url)
+            rate_limiter.record_success()
+            return data
         except HTTPError as e:
-            # Retry on server errors (502, 503, 504)
-            if e.code in (502, 503, 504):
+            # Retry on throttling (429) and server errors (502, 503, 504)
+            if e.code in (429, 502, 503, 504):
+                rate_limiter.record_backoff(epoch)
                 if attempt < max_retries - 1:
                     delay = base_delay * (2 ** attempt)  # Exponential backoff
-                    print(f"  HTTP {e.code} error, retrying in {delay}s... (attempt {attempt + 1}/{max_retries})")
+                    # Honour Retry-After (in seconds) when the server sends it
+                    retry_after = e.headers.get('Retry-After', '') if e.headers else ''
+                    if retry_after.isdigit():
+                        delay = max(delay, int(retry_after))
+                    log(f"  HTTP {e.code} error, retrying in {delay}s... (attempt {attempt + 1}/{max_retries})")
                     time.sleep(delay)
                     continue
                 else:
-                    print(f"  HTTP {e.code} error, max retries exceeded")
+                    log(f"  HTTP {e.code} error, max retries exceeded")
             raise
-        except URLError as e:
+        except (URLError, http.client.HTTPException, OSError) as e:
             if attempt < max_retries - 1:
                 delay = base_delay * (2 ** attempt)
-                print(f"  Network error ({e.reason}), retrying in {delay}s... (attempt {attempt + 1}/{max_retries})")
+                log(f"  Network error ({e}), retrying in {delay}s... (attempt {attempt + 1}/{max_retries})")
                 time.sleep(delay)
                 continue
             raise
     raise Exception("Max retries exceeded")
 
 
-def fetch_filter_data_from_bundle():
+def write_cache_file(path, data):
+    """Atomically write bytes to a cache file, so an interrupted run never leaves a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def fetch_filter_data_from_bundle(version):
     """Fetch all filter data from Blightbane JavaScript bundle."""
-    # Get bundle version
-    version = get_bundle_version()
+    # The bundle is immutable per version, so reuse filters extracted on an earlier run
+    cache_path = CACHE_DIR / f"filters-{version}.json"
+    try:
+        filters = json.loads(cache_path.read_bytes())
+        # Anything other than all five arrays is a damaged cache; re-extract it
+        if isinstance(filters, dict) and all(
+            isinstance(filters.get(filter_name), list) for filter_name in _FILTER_PATTERNS
+        ):
+            print(f"Using cached filters from {cache_path}")
+            return filters
+    except (OSError, ValueError):
+        pass
 
     # Fetch bundle
     bundle_url = f"https://blightbane.io/js/index.bundle.js?v={version}"
     print(f"Fetching bundle from {bundle_url}...")
-    with urlopen(bundle_url) as response:
-        bundle_js = response.read().decode('utf-8')
+    bundle_js = http_get(bundle_url).decode('utf-8')
 
     print("Extracting filter arrays from bundle...")
 
-    # Extract each filter array using patterns from the skill
-    filters = {}
-
-    # Categories: ["Action","Item",...]
-    filters['categories'] = extract_filter_array(
-        bundle_js,
-        r'"Action","Item"[^]]*',
-        'categories'
-    )
-
-    # Types: ["Melee","Magic",...]
-    filters['types'] = extract_filter_array(
-        bundle_js,
-        r'"Melee","Magic"[^]]*',
-        'types'
-    )
-
-    # Rarities: ["Common","Uncommon",...]
-    filters['rarities'] = extract_filter_array(
-        bundle_js,
-        r'"Common","Uncommon"[^]]*',
-        'rarities'
-    )
-
-    # Banners/Colors: ["Green","Blue","Red","Purple",...]
-    filters['colors'] = extract_filter_array(
-        bundle_js,
-        r'"Green","Blue","Red","Purple"[^]]*',
-        'colors'
-    )
-
-    # Expansions: ["Core","Metaprogress",...]
-    filters['expansions'] = extract_filter_array(
-        bundle_js,
-        r'"Core","Metaprogress"[^]]*',
-        'expansions'
-    )
+    filters = extract_filter_arrays(bundle_js)
 
+    write_cache_file(cache_path, json.dumps(filters).encode('utf-8'))
     return filters
 
 
@@ -142,6 +422,17 @@ def create_database(db_path):
     # PRAGMA must be set per-connection, before other operations
     conn.execute("PRAGMA foreign_keys = ON")
 
+    # Build-time tuning: WAL with synchronous=NORMAL fsyncs once per commit
+    # instead of twice, and a large cache keeps the B-trees in memory.
+    # finalize_database() switches back to a rollback journal before shipping.
+    conn.executescript("""
+        PRAGMA journal_mode = WAL;
+        PRAGMA synchronous = NORMAL;
+        PRAGMA temp_store = MEMORY;
+        PRAGMA cache_size = -200000;
+        PRAGMA mmap_size = 268435456;
+    """)
+
     # Use executescript to run all SQL statements in one call
     conn.executescript("""
         CREATE TABLE categories (
@@ -185,12 +476,6 @@ def create_database(db_path):
             FOREIGN KEY (color) REFERENCES colors(id)
         ) STRICT;
 
-        CREATE INDEX idx_cards_category ON cards(category);
-        CREATE INDEX idx_cards_type ON cards(type);
-        CREATE INDEX idx_cards_rarity ON cards(rarity);
-        CREATE INDEX idx_cards_expansion ON cards(expansion);
-        CREATE INDEX idx_cards_color ON cards(color);
-
         CREATE TABLE costs (
             card_id INTEGER PRIMARY KEY,
             dex INTEGER NOT NULL DEFAULT 0,
@@ -214,9 +499,6 @@ def create_database(db_path):
             FOREIGN KEY (expansion) REFERENCES expansions(id)
         ) STRICT;
 
-        CREATE INDEX idx_talents_tier ON talents(tier);
-        CREATE INDEX idx_talents_expansion ON talents(expansion);
-
         CREATE TABLE talent_prerequisites (
             talent_id INTEGER NOT NULL,
             prerequisite_id INTEGER NOT NULL,
@@ -224,20 +506,38 @@ def create_database(db_path):
             FOREIGN KEY (talent_id) REFERENCES talents(id),
             FOREIGN KEY (prerequisite_id) REFERENCES talents(id)
         ) STRICT;
+    """)
+
+    return conn
+
+
+def create_indexes(conn):
+    """Create secondary indexes once the tables are fully loaded."""
+    print("\nCreating indexes...")
+
+    # Building each index once over the final data is cheaper than
+    # maintaining it on every insert during the load
+    conn.executescript("""
+        CREATE INDEX idx_cards_category ON cards(category);
+        CREATE INDEX idx_cards_type ON cards(type);
+        CREATE INDEX idx_cards_rarity ON cards(rarity);
+        CREATE INDEX idx_cards_expansion ON cards(expansion);
+        CREATE INDEX idx_cards_color ON cards(color);
+
+        CREATE INDEX idx_talents_tier ON talents(tier);
+        CREATE INDEX idx_talents_expansion ON talents(expansion);
 
         CREATE INDEX idx_talent_prereq_talent ON talent_prerequisites(talent_id);
         CREATE INDEX idx_talent_prereq_prerequisite ON talent_prerequisites(prerequisite_id);
     """)
 
-    return conn
-
 
-def populate_lookup_tables(conn):
+def populate_lookup_tables(conn, version):
     """Populate lookup tables from Blightbane bundle."""
     print("\nPopulating lookup tables...")
 
     # Fetch all filter data from bundle
-    filters = fetch_filter_data_from_bundle()
+    filters = fetch_filter_data_from_bundle(version)
 
     # Process each filter type
     # Note: Array index = filter ID in API
@@ -261,18 +561,25 @@ def populate_lookup_tables(conn):
 
         print(f"  {table_name}: {len(values)} entries")
 
-        for id_val, name in enumerate(values):
-            conn.execute(
-                f"INSERT INTO {table_name} (id, name) VALUES (?, ?)",
-                (id_val, name)
-            )
+        # One prepared statement per table, bound once per value
+        conn.executemany(
+            f"INSERT INTO {table_name} (id, name) VALUES (?, ?)",
+            enumerate(values)
+        )
 
     conn.commit()
 
 
-def collect_card_ids(conn):
-    """Collect all unique card IDs by querying all rarity/color combinations."""
-    print("\nCollecting card IDs from all rarity/color combinations...")
+def query_card_list(query_string):
+    """Query the search endpoint and return the matching cards. Runs on a worker thread."""
+    url = f"https://blightbane.io/api/cards?{query_string}"
+    data = json.loads(fetch_with_retry(url))
+    return data.get('cards', [])
+
+
+def collect_cards(conn):
+    """Collect all unique cards by querying all rarity/color combinations, keyed by card ID."""
+    print("\nCollecting cards from all rarity/color combinations...")
 
     # Get all rarities and colors from database
     rarities = [row[0] for row in conn.execute("SELECT id FROM rarities ORDER BY id")]
@@ -281,41 +588,33 @@ def collect_card_ids(conn):
     total_queries = len(rarities) * len(colors)
     print(f"  Will query {len(rarities)} rarities × {len(colors)} colors = {total_queries} combinations")
 
-    card_ids = set()
-    query_count = 0
-
-    for rarity in rarities:
-        for color in colors:
-            query_count += 1
-            params = {
-                'search': '',
-                'rarity': rarity,
-                'category': '',
-                'type': '',
-                'banner': color,
-                'exp': ''
-            }
-            url = f"https://blightbane.io/api/cards?{urlencode(params)}"
-
-            try:
-                with urlopen(url) as response:
-                    data = json.loads(response.read().decode('utf-8'))
-                    cards = data.get('cards', [])
-                    for card in cards:
-                        card_ids.add(card['id'])
-
-                    if cards:  # Only print if cards were found
-                        print(f"  [{query_count}/{total_queries}] Rarity {rarity}, Color {color}: {len(cards)} cards")
-            except Exception as e:
-                print(f"  ERROR querying rarity={rarity}, color={color}: {e}")
-
-    print(f"\nFound {len(card_ids)} unique cards total")
-    return sorted(card_ids)
-
-
-def collect_talent_ids(conn):
-    """Collect all unique talent IDs by querying all tier/expansion combinations."""
-    print("\nCollecting talent IDs from all tier/expansion combinations...")
+    combinations = list(product(rarities, colors))
+
+    def query(combination):
+        rarity, color = combination
+        # All parameters must be present even if empty; IDs are integers so need no escaping
+        query_string = f"search=&rarity={rarity}&category=&type=&banner={color}&exp="
+        try:
+            return query_card_list(query_string)
+        except Exception as e:
+            log(f"  ERROR querying rarity={rarity}, color={color}: {e}")
+            return []
+
+    found_cards = {}
+
+    for query_count, (_, cards) in enumerate(fetch_concurrently(query, combinations), 1):
+        for card in cards:
+            found_cards.setdefault(card['id'], card)
+
+        print_progress(query_count, total_queries, 'queries', QUERY_PROGRESS_INTERVAL)
+
+    print(f"\nFound {len(found_cards)} unique cards total")
+    return found_cards
+
+
+def collect_talents(conn):
+    """Collect all unique talents by querying all tier/expansion combinations, keyed by talent ID."""
+    print("\nCollecting talents from all tier/expansion combinations...")
 
     # Get all expansions from database
     expansions = [row[0] for row in conn.execute("SELECT id FROM expansions ORDER BY id")]
@@ -326,89 +625,122 @@ def collect_talent_ids(conn):
     total_queries = len(tiers) * len(expansions)
     print(f"  Will query {len(tiers)} tiers × {len(expansions)} expansions = {total_queries} combinations")
 
-    talent_ids = set()
-    query_count = 0
-
-    for tier in tiers:
-        for expansion in expansions:
-            query_count += 1
-            # Talents use category=10, rarity parameter maps to tier
-            params = {
-                'search': '',
-                'rarity': tier,
-                'category': 10,
-                'type': '',
-                'banner': '',
-                'exp': expansion
-            }
-            url = f"https://blightbane.io/api/cards?{urlencode(params)}"
-
-            try:
-                with urlopen(url) as response:
-                    data = json.loads(response.read().decode('utf-8'))
-                    talents = data.get('cards', [])
-                    for talent in talents:
-                        talent_ids.add(talent['id'])
-
-                    if talents:  # Only print if talents were found
-                        print(f"  [{query_count}/{total_queries}] Tier {tier}, Expansion {expansion}: {len(talents)} talents")
-            except Exception as e:
-                print(f"  ERROR querying tier={tier}, expansion={expansion}: {e}")
-
-    print(f"\nFound {len(talent_ids)} unique talents total")
-    return sorted(talent_ids)
-
-
-def fetch_and_store_talent(conn, talent_id, index, total):
-    """Fetch individual talent details and store in database (without prerequisites)."""
+    combinations = list(product(tiers, expansions))
+
+    def query(combination):
+        tier, expansion = combination
+        # Talents use category=10, rarity parameter maps to tier
+        query_string = f"search=&rarity={tier}&category=10&type=&banner=&exp={expansion}"
+        try:
+            return query_card_list(query_string)
+        except Exception as e:
+            log(f"  ERROR querying tier={tier}, expansion={expansion}: {e}")
+            return []
+
+    found_talents = {}
+
+    for query_count, (_, talents) in enumerate(fetch_concurrently(query, combinations), 1):
+        for talent in talents:
+            found_talents.setdefault(talent['id'], talent)
+
+        print_progress(query_count, total_queries, 'queries', QUERY_PROGRESS_INTERVAL)
+
+    print(f"\nFound {len(found_talents)} unique talents total")
+    return found_talents
+
+
+def split_complete(entries, required_fields):
+    """Split search results into entries usable as-is and IDs that still need a detail fetch."""
+    complete = {}
+    incomplete_ids = []
+    for entry_id, entry in entries.items():
+        if all(field in entry for field in required_fields):
+            complete[entry_id] = entry
+        else:
+            incomplete_ids.append(entry_id)
+    return complete, incomplete_ids
+
+
+def has_fields(payload, required_fields):
+    """Whether a parsed response is an object containing every required field."""
+    return isinstance(payload, dict) and all(field in payload for field in required_fields)
+
+
+def fetch_json_cached(url, cache_path, required_fields):
+    """Fetch and parse a JSON response, reusing the copy saved at cache_path by an earlier run."""
+    try:
+        cached = json.loads(cache_path.read_bytes())
+        if has_fields(cached, required_fields):
+            return cached
+    except (OSError, ValueError):
+        pass
+
+    data = fetch_with_retry(url)
+    parsed = json.loads(data)
+    # Only cache usable responses, so an error payload is refetched next run
+    if has_fields(parsed, required_fields):
+        write_cache_file(cache_path, data)
+    return parsed
+
+
+def fetch_talent(talent_id, version):
+    """Fetch individual talent details. Runs on a worker thread; returns None on failure."""
     url = f"https://blightbane.io/api/card/{talent_id}?talent=true"
+    cache_path = CACHE_DIR / version / 'talents' / f"{talent_id}.json"
 
     try:
-        response_text = fetch_with_retry(url)
-        talent = json.loads(response_text)
+        return fetch_json_cached(url, cache_path, TALENT_REQUIRED_FIELDS)
+    except Exception as e:
+        log(f"  ERROR fetching talent {talent_id}: {e}")
+        return None
+
+
+def fetch_card(card_id, version):
+    """Fetch individual card details. Runs on a worker thread; returns None on failure."""
+    url = f"https://blightbane.io/api/card/{card_id}"
+    cache_path = CACHE_DIR / version / 'cards' / f"{card_id}.json"
+
+    try:
+        return fetch_json_cached(url, cache_path, CARD_REQUIRED_FIELDS)
+    except Exception as e:
+        log(f"  ERROR fetching card {card_id}: {e}")
+        return None
+
 
+def talent_row(talent_id, talent):
+    """Convert fetched talent details into a talents row, returning (row, prerequisites)."""
+    if talent is None:
+        return None
+
+    try:
         # Sanitize description
         description = sanitize_html(talent.get('description', ''))
 
-        # Insert talent (without prerequisites for now)
-        conn.execute("""
-            INSERT INTO talents (id, name, tier, expansion, description_html)
-            VALUES (?, ?, ?, ?, ?)
-        """, (
+        row = (
             talent['id'],
             talent['name'],
             talent['tier'],
             talent['expansion'],
             description
-        ))
-
-        if (index + 1) % 10 == 0 or (index + 1) == total:
-            print(f"  Progress: {index + 1}/{total} talents")
-
+        )
         # Return prerequisites for later insertion
-        return (True, talent.get('prereq', []))
+        return (row, talent.get('prereq', []))
 
     except Exception as e:
-        print(f"  ERROR fetching talent {talent_id}: {e}")
-        return (False, [])
+        log(f"  ERROR parsing talent {talent_id}: {e}")
+        return None
 
 
-def fetch_and_store_card(conn, card_id, index, total):
-    """Fetch individual card details and store in database."""
-    url = f"https://blightbane.io/api/card/{card_id}"
+def card_rows(card_id, card):
+    """Convert fetched card details into (cards row, costs row)."""
+    if card is None:
+        return None
 
     try:
-        response_text = fetch_with_retry(url)
-        card = json.loads(response_text)
-
         # Sanitize description
         description = sanitize_html(card.get('description', ''))
 
-        # Insert card
-        conn.execute("""
-            INSERT INTO cards (id, name, category, type, rarity, expansion, color, description_html)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        card_row = (
             card['id'],
             card['name'],
             card['category'],
@@ -417,14 +749,10 @@ def fetch_and_store_card(conn, card_id, index, total):
             card['expansion'],
             card['color'],
             description
-        ))
+        )
 
-        # Insert costs
         cost = card.get('cost', {})
-        conn.execute("""
-            INSERT INTO costs (card_id, dex, int, str, holy, neutral, dexint, dexstr, intstr, blood)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        cost_row = (
             card['id'],
             cost.get('dex', 0),
             cost.get('int', 0),
@@ -435,61 +763,96 @@ def fetch_and_store_card(conn, card_id, index, total):
             cost.get('dexstr', 0),
             cost.get('intstr', 0),
             cost.get('blood', 0)
-        ))
+        )
+        return (card_row, cost_row)
 
-        if (index + 1) % 10 == 0 or (index + 1) == total:
-            print(f"  Progress: {index + 1}/{total} cards")
+    except Exception as e:
+        log(f"  ERROR parsing card {card_id}: {e}")
+        return None
 
-        return True
 
-    except Exception as e:
-        print(f"  ERROR fetching card {card_id}: {e}")
-        return False
+def insert_rows(conn, insert, rows):
+    """Insert rows with multi-row VALUES statements built from a (prefix, row placeholders) insert."""
+    if not rows:
+        return
+
+    prefix, row_placeholders = insert
+    chunk_size = min(ROWS_PER_STATEMENT, MAX_VARIABLES // len(rows[0]))
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        conn.execute(
+            prefix + ', '.join([row_placeholders] * len(chunk)),
+            [value for row in chunk for value in row]
+        )
+
+
+def insert_batch(conn, statements, batch, label):
+    """Insert a batch of items in one transaction and return how many were stored.
+
+    Each item in batch is a tuple with one row per statement (e.g. a card row
+    and its costs row). If the batch violates a constraint, it is retried
+    row by row so one bad item doesn't lose the rest.
+    """
+    if not batch:
+        return 0
+
+    # Results arrive in completion order; appending IDs in ascending order keeps B-tree inserts cheap
+    batch.sort(key=lambda item: item[0][0])
+
+    try:
+        for position, insert in enumerate(statements):
+            insert_rows(conn, insert, [item[position] for item in batch])
+        conn.commit()
+        return len(batch)
+    except sqlite3.Error:
+        conn.rollback()
+
+    stored = 0
+    for item in batch:
+        try:
+            for (prefix, row_placeholders), row in zip(statements, item):
+                conn.execute(prefix + row_placeholders, row)
+            stored += 1
+        except sqlite3.Error as e:
+            log(f"  ERROR storing {label} {item[0][0]}: {e}")
+    conn.commit()
+    return stored
 
 
 def prune_unused_filters(conn):
     """Remove filter values that do not correspond to any cards."""
     print("\nPruning unused filter values...")
 
-    removed_any = False
     for table_name, column_name in (
         ("categories", "category"),
         ("rarities", "rarity"),
         ("colors", "color"),
     ):
-        removed_count = 0
-        rows = list(
-            conn.execute(
-                f"""
-                SELECT
-                    lookup.id,
-                    lookup.name,
-                    COUNT(cards.id) AS card_count
-                FROM {table_name} AS lookup
-                LEFT JOIN cards ON cards.{column_name} = lookup.id
-                GROUP BY lookup.id, lookup.name
-                ORDER BY lookup.id
-                """
+        # Anti-join against the card index instead of counting cards per value
+        cursor = conn.execute(
+            f"""
+            DELETE FROM {table_name}
+            WHERE NOT EXISTS (
+                SELECT 1 FROM cards WHERE cards.{column_name} = {table_name}.id
             )
+            """
         )
 
-        unused_ids = [identifier for identifier, _, count in rows if count == 0]
-
-        if unused_ids:
-            conn.executemany(
-                f"DELETE FROM {table_name} WHERE id = ?",
-                ((identifier,) for identifier in unused_ids),
-            )
-            removed_count = len(unused_ids)
-
-        if removed_count:
-            removed_any = True
+        if cursor.rowcount:
             print(
-                f"  Removed {removed_count} {table_name} entries with no associated cards",
+                f"  Removed {cursor.rowcount} {table_name} entries with no associated cards",
             )
-    
+
     conn.commit()
 
+
+def finalize_database(conn):
+    """Checkpoint the WAL and leave a single self-contained database file."""
+    # sql.js in the browser cannot open WAL-mode databases
+    conn.execute("PRAGMA journal_mode = DELETE")
+
+
 def main():
     if len(sys.argv) != 2:
         print("Usage: python create-db/run.py <output_database.db>")
@@ -504,56 +867,89 @@ def main():
     # Create database
     conn = create_database(db_path)
 
-    # Populate lookup tables
-    populate_lookup_tables(conn)
+    # Cached API responses are only reused while the bundle version is unchanged
+    version = get_bundle_version()
 
-    talent_ids = collect_talent_ids(conn)
-    print(f"\nFetching talent details (0.25s delay between requests)...")
+    # Populate lookup tables
+    populate_lookup_tables(conn, version)
+    # Everything after this point fetches on worker threads with their own connections
+    close_connections([getattr(_connections, 'pool', {})])
+
+    talents = collect_talents(conn)
+    # Only fetch details for talents whose search result is missing fields
+    complete_talents, talent_ids = split_complete(talents, TALENT_FIELDS)
+    if complete_talents:
+        print(f"  {len(complete_talents)} talents fully described by search results")
+    print(f"\nFetching details for {len(talent_ids)} talents ({MAX_WORKERS} workers, up to {MAX_REQUESTS_PER_SECOND} requests/s)...")
     talent_success_count = 0
     talent_prerequisites = {}  # Store prerequisites for second pass
-    for i, talent_id in enumerate(talent_ids):
-        success, prereqs = fetch_and_store_talent(conn, talent_id, i, len(talent_ids))
-        if success:
-            talent_success_count += 1
+    talent_batch = []
+    # Workers only fetch and parse; all database writes happen here on the main thread
+    talent_results = chain(complete_talents.items(), fetch_concurrently(partial(fetch_talent, version=version), talent_ids))
+    for i, (talent_id, talent) in enumerate(talent_results):
+        parsed = talent_row(talent_id, talent)
+        if parsed:
+            row, prereqs = parsed
+            talent_batch.append((row,))
             if prereqs:
                 talent_prerequisites[talent_id] = prereqs
-        time.sleep(0.25)  # Rate limiting
-        conn.commit()  # Commit after each talent
+        if len(talent_batch) >= BATCH_SIZE:
+            talent_success_count += insert_batch(conn, TALENT_INSERTS, talent_batch, 'talent')
+            talent_batch.clear()
+
+        print_progress(i + 1, len(talents), 'talents')
+    talent_success_count += insert_batch(conn, TALENT_INSERTS, talent_batch, 'talent')
 
     # Second pass: Insert all talent prerequisites now that all talents exist
     print(f"\nInserting talent prerequisites...")
-    prereq_count = 0
+    # OR IGNORE doesn't cover foreign keys, so drop links to talents that weren't stored up front
+    stored_talent_ids = {row[0] for row in conn.execute("SELECT id FROM talents")}
+    prereq_rows = []
     for talent_id, prereqs in talent_prerequisites.items():
         for prereq_id in prereqs:
-            try:
-                conn.execute("""
-                    INSERT INTO talent_prerequisites (talent_id, prerequisite_id)
-                    VALUES (?, ?)
-                """, (talent_id, prereq_id))
-                prereq_count += 1
-            except Exception as e:
-                print(f"  WARNING: Could not insert prerequisite {prereq_id} for talent {talent_id}: {e}")
+            if talent_id in stored_talent_ids and prereq_id in stored_talent_ids:
+                prereq_rows.append((talent_id, prereq_id))
+            else:
+                print(f"  WARNING: Could not insert prerequisite {prereq_id} for talent {talent_id}: talent not in database")
+    cursor = conn.executemany("""
+        INSERT OR IGNORE INTO talent_prerequisites (talent_id, prerequisite_id)
+        VALUES (?, ?)
+    """, prereq_rows)
+    prereq_count = cursor.rowcount
     conn.commit()
     print(f"  Inserted {prereq_count} prerequisite relationships")
 
     # Collect and fetch cards
-    card_ids = collect_card_ids(conn)
-    print(f"\nFetching card details (0.25s delay between requests)...")
+    cards = collect_cards(conn)
+    # Search results currently lack costs, but use them directly if the API ever includes them
+    complete_cards, card_ids = split_complete(cards, CARD_FIELDS)
+    if complete_cards:
+        print(f"  {len(complete_cards)} cards fully described by search results")
+    print(f"\nFetching details for {len(card_ids)} cards ({MAX_WORKERS} workers, up to {MAX_REQUESTS_PER_SECOND} requests/s)...")
     card_success_count = 0
-    for i, card_id in enumerate(card_ids):
-        if fetch_and_store_card(conn, card_id, i, len(card_ids)):
-            card_success_count += 1
-        time.sleep(0.25)  # Rate limiting
-        conn.commit()  # Commit after each card
-
+    card_batch = []
+    card_results = chain(complete_cards.items(), fetch_concurrently(partial(fetch_card, version=version), card_ids))
+    for i, (card_id, card) in enumerate(card_results):
+        rows = card_rows(card_id, card)
+        if rows:
+            card_batch.append(rows)
+        if len(card_batch) >= BATCH_SIZE:
+            card_success_count += insert_batch(conn, CARD_INSERTS, card_batch, 'card')
+            card_batch.clear()
+
+        print_progress(i + 1, len(cards), 'cards')
+    card_success_count += insert_batch(conn, CARD_INSERTS, card_batch, 'card')
+
+    create_indexes(conn)
     prune_unused_filters(conn)
+    finalize_database(conn)
 
     # Summary
     print("\n" + "="*60)
     print(f"COMPLETE:")
-    print(f"  Talents: {talent_success_count}/{len(talent_ids)} inserted")
+    print(f"  Talents: {talent_success_count}/{len(talents)} inserted")
     print(f"  Talent Prerequisites: {prereq_count} relationships inserted")
-    print(f"  Cards: {card_success_count}/{len(card_ids)} inserted")
+    print(f"  Cards: {card_success_count}/{len(cards)} inserted")
     print(f"Database: {db_path}")
     print("="*60)
 